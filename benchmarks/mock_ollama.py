@@ -0,0 +1,150 @@
+"""
+mock_ollama.py
+
+A local stand-in for Ollama's /api/generate endpoint, used to benchmark label_chunks_full.py
+and query_llm() without a GPU or a downloaded model.
+
+The mock answers every request with a fixed tag line and a short explanation, in the same JSON
+shape as Ollama (including prompt_eval_count/eval_count and the *_duration fields in nanoseconds).
+Response time is simulated as:
+  latency_ms + prompt tokens * prefill_ms_per_token + response tokens * generate_ms_per_token
+
+At most `concurrency` requests are processed at once; further requests wait, like Ollama with
+OLLAMA_NUM_PARALLEL set. Only the standard library is used.
+
+Run standalone:
+  python benchmarks/mock_ollama.py --port 11435 --latency-ms 50 --concurrency 2
+  OLLAMA_URL=http://127.0.0.1:11435/api/generate python src/label_chunks_full.py --profile
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+MOCK_RESPONSE = (
+    "personal_reflection, speculative_or_poetic_expression\n"
+    "The text reflects on lived experience and imagines possible futures in a poetic register."
+)
+
+
+class MockOllamaServer:
+    """Threaded HTTP server imitating Ollama's /api/generate with configurable latency and concurrency."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, concurrency=1,
+                 prefill_ms_per_token=0.0, generate_ms_per_token=0.0):
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        self.latency_ms = latency_ms
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.generate_ms_per_token = generate_ms_per_token
+        self.concurrency = concurrency
+        self.requests_served = 0
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def serve_forever(self):
+        """Serve in the current thread (used when run as a script)."""
+        self._httpd.serve_forever()
+
+    def start(self):
+        """Serve from a background thread and return immediately."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def generate(self, request):
+        """Build an Ollama-style response for a parsed /api/generate request body."""
+        prompt_tokens = len(request.get("prompt", "").split())
+        response_tokens = len(MOCK_RESPONSE.split())
+        prefill_ms = prompt_tokens * self.prefill_ms_per_token
+        generate_ms = response_tokens * self.generate_ms_per_token
+
+        with self._slots:
+            start = time.perf_counter()
+            time.sleep((self.latency_ms + prefill_ms + generate_ms) / 1000.0)
+            total_ns = int((time.perf_counter() - start) * 1e9)
+
+        with self._lock:
+            self.requests_served += 1
+
+        return {
+            "model": request.get("model", "mock"),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "response": MOCK_RESPONSE,
+            "done": True,
+            "total_duration": total_ns,
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prefill_ms * 1e6),
+            "eval_count": response_tokens,
+            "eval_duration": int(generate_ms * 1e6),
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self.send_error(400, "Invalid JSON")
+                    return
+
+                body = json.dumps(server.generate(request)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output clean
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Ollama /api/generate server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay per request")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests processed in parallel")
+    parser.add_argument("--prefill-ms-per-token", type=float, default=0.0)
+    parser.add_argument("--generate-ms-per-token", type=float, default=0.0)
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    server = MockOllamaServer(args.host, args.port, args.latency_ms, args.concurrency,
+                              args.prefill_ms_per_token, args.generate_ms_per_token)
+    print(f"Mock Ollama listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
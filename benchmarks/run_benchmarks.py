@@ -0,0 +1,492 @@
+"""
+run_benchmarks.py
+
+Reproducible performance benchmarks for the Critical AI Writing Companion.
+Writes one machine-readable JSON file per run, so results can be compared across commits.
+
+Suites:
+- retrieval: synthetic archives (default 1k and 100k chunks; 1m on request) are pickled in the
+  embed_chunks.py format, then measured for load_archive() time and peak memory, single-query
+  latency percentiles, batch-call latency and recall@k against exact search, for every mode
+  in RETRIEVAL_MODES, plus the peak RSS while a mode answers queries (tracemalloc, used for
+  load_peak_mb, cannot see torch allocations). utils.py has no batched retrieval yet, so the
+  get_top_chunks mode answers a batch by looping; a batched mode can be registered and
+  compared against it.
+- labeling: label_chunks_full.py is run against the local mock Ollama server (mock_ollama.py)
+  for every combination of mock latency and concurrency. With concurrency N, N labeling
+  processes share the rows, so the mock's parallel slots are actually exercised.
+  chunks_per_s covers only the labeling loop (from the scripts' label_all spans), not
+  interpreter start-up; wall_s is reported separately.
+- embedding (opt-in, downloads all-MiniLM-L6-v2): embed_chunks.py on a synthetic labeled CSV.
+
+The labeling and embedding scripts are run with --trace, which is how their timings reach this
+runner. For labeling this means three JSONL lines per chunk (written to an already open,
+line-buffered file) are included in the measured time; results carry "trace_instrumented": true so this is visible when comparing runs.
+The retrieval suite runs in-process with profiling disabled.
+
+Examples:
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --suites retrieval --sizes 1k,100k,1m
+  python benchmarks/run_benchmarks.py --suites labeling --mock-latency-ms 0,50 --mock-concurrency 1,4
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+import synthetic
+from mock_ollama import MockOllamaServer
+from profiling import Profiler, profiler
+
+
+SUITES = ("retrieval", "labeling", "embedding")
+DEFAULT_SUITES = "retrieval,labeling"
+
+
+def _get_top_chunks_ids(queries, df, k):
+    import torch
+    from utils import get_top_chunks
+
+    return [
+        [chunk["id"] for chunk in get_top_chunks(torch.from_numpy(query), df, num_chunks=k)]
+        for query in queries
+    ]
+
+
+# Retrieval implementations to compare. Each takes (an (n, dim) float32 numpy matrix of
+# queries, archive DataFrame, k) and returns one list of top-k chunk ids per query.
+RETRIEVAL_MODES = {
+    "get_top_chunks": _get_top_chunks_ids,
+}
+
+
+def parse_size(text):
+    """'1k' -> 1000, '100k' -> 100000, '1m' -> 1000000, '2500' -> 2500."""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+def parse_list(text, cast=str):
+    return [cast(item) for item in text.split(",") if item.strip()]
+
+
+def latency_stats(durations_ms):
+    """Count, mean and p50/p90/p99 (ms) for a list of durations, via the profiling module."""
+    stats = Profiler(window=max(1, len(durations_ms)))
+    stats.configure(enabled=True)
+    for duration in durations_ms:
+        stats.record("latency", duration)
+    return stats.summary().get("latency", {"count": 0})
+
+
+def current_rss_bytes():
+    """Resident set size of this process (psutil if installed, else /proc), or None."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def max_rss_bytes():
+    """Peak RSS so far from getrusage (kilobytes on Linux, bytes on macOS)."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRSS:
+    """
+    Track the peak RSS of the enclosed block, including memory tracemalloc cannot see
+    (torch tensors). Samples the current RSS from a background thread; where that is not
+    available, falls back to the growth of getrusage's process-wide peak.
+    """
+
+    def __init__(self, interval_s=0.005):
+        self.interval_s = interval_s
+        self.baseline = self.peak = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval_s):
+            self.peak = max(self.peak, current_rss_bytes())
+
+    def __enter__(self):
+        gc.collect()
+        self.sampling = current_rss_bytes() is not None
+        if self.sampling:
+            self.baseline = self.peak = current_rss_bytes()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        else:
+            self.baseline = self.peak = max_rss_bytes()
+        return self
+
+    def __exit__(self, *exc):
+        if self.sampling:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, current_rss_bytes())
+        else:
+            self.peak = max_rss_bytes()
+
+    def as_dict(self):
+        return {
+            "peak_rss_mb": round(self.peak / 2**20, 2),
+            "rss_growth_mb": round((self.peak - self.baseline) / 2**20, 2),
+            "method": "sampled_rss" if self.sampling else "ru_maxrss_delta",
+        }
+
+
+def read_trace(path):
+    """Group the entries of a JSONL trace written via --trace by span name."""
+    spans = {}
+    if not os.path.exists(path):
+        return spans
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            spans.setdefault(entry["span"], []).append(entry)
+    return spans
+
+
+def run_metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    versions = {}
+    for module in ("numpy", "pandas", "torch", "sentence_transformers", "requests"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+        "args": vars(args),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Retrieval suite
+# ---------------------------------------------------------------------------
+
+def bench_retrieval_size(size, args, workdir):
+    from utils import load_archive
+
+    print(f"\n[retrieval] {size} chunks")
+    embeddings = synthetic.generate_embeddings(size, seed=args.seed)
+    queries = synthetic.generate_queries(embeddings, args.queries + args.batch_size, seed=args.seed)
+    single_queries, batch_queries = queries[:args.queries], queries[args.queries:]
+    truth = synthetic.exact_top_k(embeddings, single_queries, args.top_k)
+
+    archive_path = Path(workdir) / f"archive_{size}.pkl"
+    synthetic.write_archive_pickle(archive_path, embeddings, seed=args.seed)
+    del embeddings
+
+    start = time.perf_counter()
+    df = load_archive(archive_path)
+    load_s = time.perf_counter() - start
+    del df
+
+    # Second load under tracemalloc, so the timing above is not slowed down by tracing
+    tracemalloc.start()
+    df = load_archive(archive_path)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "chunks": size,
+        "archive_file_mb": round(archive_path.stat().st_size / 2**20, 2),
+        "load_s": round(load_s, 4),
+        "load_peak_mb": round(peak_bytes / 2**20, 2),
+        "modes": {},
+    }
+    print(f"  load_archive: {load_s:.3f}s, peak {result['load_peak_mb']} MB")
+
+    for name, retrieve in RETRIEVAL_MODES.items():
+        retrieve(single_queries[:1], df, args.top_k)  # warm-up
+
+        durations, hits = [], 0
+        for i, expected in enumerate(truth):
+            start = time.perf_counter()
+            ids = retrieve(single_queries[i:i + 1], df, args.top_k)[0]
+            durations.append((time.perf_counter() - start) * 1000.0)
+            hits += len(expected.intersection(ids))
+
+        batch = None
+        if len(batch_queries):
+            batch_durations = []
+            for _ in range(args.batch_repeats):
+                start = time.perf_counter()
+                retrieve(batch_queries, df, args.top_k)
+                batch_durations.append((time.perf_counter() - start) * 1000.0)
+            batch = {
+                "queries_per_call": len(batch_queries),
+                "call_ms": latency_stats(batch_durations),
+                "per_query_ms": round(sum(batch_durations) / len(batch_durations) / len(batch_queries), 3),
+            }
+
+        # Untimed pass for memory, so the sampling thread does not disturb the latencies above
+        with PeakRSS() as memory:
+            retrieve(batch_queries if len(batch_queries) else single_queries[:1], df, args.top_k)
+
+        mode_result = {
+            "single_query_ms": latency_stats(durations),
+            "batch": batch,
+            "query_memory": memory.as_dict(),
+            f"recall_at_{args.top_k}": round(hits / (args.top_k * len(truth)), 4),
+        }
+        result["modes"][name] = mode_result
+        batch_note = f"batch of {len(batch_queries)} p50 {batch['call_ms']['p50_ms']:.1f} ms, " if batch else ""
+        print(f"  {name}: single p50 {mode_result['single_query_ms']['p50_ms']:.1f} ms, {batch_note}"
+              f"query RSS +{mode_result['query_memory']['rss_growth_mb']} MB, "
+              f"recall@{args.top_k} {mode_result[f'recall_at_{args.top_k}']}")
+
+    archive_path.unlink()
+    return result
+
+
+def bench_retrieval(args, workdir):
+    return [bench_retrieval_size(parse_size(size), args, workdir) for size in parse_list(args.sizes)]
+
+
+# ---------------------------------------------------------------------------
+# Labeling suite
+# ---------------------------------------------------------------------------
+
+def run_script(script, script_args, env, workdir, name):
+    """Start a src/ script in its own process; its trace goes to <workdir>/<name>.jsonl."""
+    trace_path = Path(workdir) / f"{name}.jsonl"
+    process = subprocess.Popen(
+        [sys.executable, str(SRC_DIR / script), "--trace", str(trace_path)] + script_args,
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    return process, trace_path
+
+
+def wait_for(processes, script, timeout_s):
+    """Wait for all processes; a client that is stuck past the deadline fails the run."""
+    deadline = time.monotonic() + timeout_s
+    try:
+        for process in processes:
+            try:
+                _, stderr = process.communicate(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                raise RuntimeError(f"{script} did not finish within {timeout_s}s")
+            if process.returncode != 0:
+                raise RuntimeError(f"{script} exited with {process.returncode}:\n{stderr[-2000:]}")
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+                process.communicate()
+
+
+def bench_labeling_config(latency_ms, concurrency, args, workdir):
+    print(f"\n[labeling] mock latency {latency_ms} ms, concurrency {concurrency}")
+    clients = max(1, min(concurrency, args.label_rows))
+    rows_per_client = [args.label_rows // clients + (1 if i < args.label_rows % clients else 0)
+                       for i in range(clients)]
+
+    inputs = []
+    for i, rows in enumerate(rows_per_client):
+        path = Path(workdir) / f"chunks_{i}.csv"
+        synthetic.write_chunks_csv(path, rows, seed=args.seed + i)
+        inputs.append(path)
+
+    with MockOllamaServer(latency_ms=latency_ms, concurrency=concurrency,
+                          prefill_ms_per_token=args.mock_prefill_ms_per_token,
+                          generate_ms_per_token=args.mock_generate_ms_per_token) as server:
+        env = dict(os.environ, OLLAMA_URL=server.url)
+        env.pop("WRITE_REFLECT_TRACE", None)
+
+        start = time.perf_counter()
+        runs = [
+            run_script("label_chunks_full.py",
+                       ["--input", str(path), "--output", str(Path(workdir) / f"labeled_{i}.csv")],
+                       env, workdir, f"label_trace_{latency_ms}_{concurrency}_{i}")
+            for i, path in enumerate(inputs)
+        ]
+        wait_for([process for process, _ in runs], "label_chunks_full.py", args.timeout)
+        wall_s = time.perf_counter() - start
+        served = server.requests_served
+
+    # The labeling window runs from the earliest start to the latest end of the clients'
+    # label_all spans (ts is written when a span ends), excluding process start-up
+    chunk_ms, starts, ends = [], [], []
+    for _, trace_path in runs:
+        spans = read_trace(trace_path)
+        chunk_ms.extend(entry["ms"] for entry in spans.get("label_chunk", []))
+        for entry in spans.get("label_all", []):
+            ends.append(entry["ts"])
+            starts.append(entry["ts"] - entry["ms"] / 1000.0)
+    label_s = max(ends) - min(starts) if ends else None
+
+    result = {
+        "mock_latency_ms": latency_ms,
+        "mock_concurrency": concurrency,
+        "clients": clients,
+        "rows": args.label_rows,
+        "requests_served": served,
+        "wall_s": round(wall_s, 4),
+        "label_s": round(label_s, 4) if label_s is not None else None,
+        "chunks_per_s": round(args.label_rows / label_s, 2) if label_s else None,
+        "chunk_ms": latency_stats(chunk_ms),
+        "trace_instrumented": True,
+    }
+    print(f"  {result['chunks_per_s']} chunks/s over {result['label_s']}s of labeling "
+          f"({wall_s:.2f}s wall, p50 {result['chunk_ms'].get('p50_ms', 0):.1f} ms per chunk)")
+    return result
+
+
+def bench_labeling(args, workdir):
+    return [
+        bench_labeling_config(latency_ms, concurrency, args, workdir)
+        for latency_ms in parse_list(args.mock_latency_ms, float)
+        for concurrency in parse_list(args.mock_concurrency, int)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Embedding suite
+# ---------------------------------------------------------------------------
+
+def bench_embedding(args, workdir):
+    print(f"\n[embedding] {args.embed_rows} rows")
+    input_path = synthetic.write_labeled_csv(Path(workdir) / "labeled.csv", args.embed_rows, seed=args.seed)
+    env = dict(os.environ)
+    env.pop("WRITE_REFLECT_TRACE", None)
+
+    start = time.perf_counter()
+    process, trace_path = run_script(
+        "embed_chunks.py", ["--input", str(input_path), "--output", str(Path(workdir) / "embedded.pkl")],
+        env, workdir, "embed_trace",
+    )
+    wait_for([process], "embed_chunks.py", args.timeout)
+    wall_s = time.perf_counter() - start
+
+    spans = {name: round(sum(entry["ms"] for entry in entries), 3)
+             for name, entries in read_trace(trace_path).items()}
+    encode_s = spans.get("encode", 0) / 1000.0
+    result = {
+        "rows": args.embed_rows,
+        "wall_s": round(wall_s, 4),
+        "span_ms": spans,
+        "encode_rows_per_s": round(args.embed_rows / encode_s, 2) if encode_s else None,
+        "trace_instrumented": True,
+    }
+    print(f"  {result['encode_rows_per_s']} rows/s encoding, {wall_s:.2f}s total")
+    return [result]
+
+
+SUITE_RUNNERS = {
+    "retrieval": bench_retrieval,
+    "labeling": bench_labeling,
+    "embedding": bench_embedding,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-Reflect benchmark suite")
+    parser.add_argument("--suites", default=DEFAULT_SUITES, help=f"Comma-separated, from: {', '.join(SUITES)}")
+    parser.add_argument("--output", default=None,
+                        help="Result JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=900,
+                        help="Seconds before a labeling/embedding subprocess counts as stuck")
+
+    retrieval = parser.add_argument_group("retrieval")
+    retrieval.add_argument("--sizes", default="1k,100k", help="Archive sizes, e.g. 1k,100k,1m")
+    retrieval.add_argument("--queries", type=int, default=50, help="Single queries timed per mode")
+    retrieval.add_argument("--batch-size", type=int, default=20, help="Queries per batch call (0 skips batches)")
+    retrieval.add_argument("--batch-repeats", type=int, default=5, help="Timed batch calls per mode")
+    retrieval.add_argument("--top-k", type=int, default=5)
+
+    labeling = parser.add_argument_group("labeling")
+    labeling.add_argument("--label-rows", type=int, default=200)
+    labeling.add_argument("--mock-latency-ms", default="0,50", help="Comma-separated fixed latencies")
+    labeling.add_argument("--mock-concurrency", default="1,4", help="Comma-separated parallel slots")
+    labeling.add_argument("--mock-prefill-ms-per-token", type=float, default=0.0)
+    labeling.add_argument("--mock-generate-ms-per-token", type=float, default=0.0)
+
+    embedding = parser.add_argument_group("embedding")
+    embedding.add_argument("--embed-rows", type=int, default=1000)
+
+    args = parser.parse_args()
+
+    suites = parse_list(args.suites)
+    unknown = [suite for suite in suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+
+    try:
+        concurrencies = parse_list(args.mock_concurrency, int)
+    except ValueError:
+        parser.error("--mock-concurrency must be a comma-separated list of integers")
+    if not concurrencies or min(concurrencies) < 1:
+        parser.error("--mock-concurrency values must be at least 1")
+    if args.timeout <= 0:
+        parser.error("--timeout must be positive")
+    for option in ("queries", "top_k", "batch_repeats", "label_rows", "embed_rows"):
+        if getattr(args, option) < 1:
+            parser.error(f"--{option.replace('_', '-')} must be at least 1")
+    if args.batch_size < 0:
+        parser.error("--batch-size must not be negative")
+    try:
+        sizes = [parse_size(size) for size in parse_list(args.sizes)]
+        parse_list(args.mock_latency_ms, float)
+    except ValueError:
+        parser.error("--sizes and --mock-latency-ms must be comma-separated numbers")
+    if not sizes or min(sizes) < args.top_k:
+        parser.error("--sizes must all be at least --top-k")
+
+    # Retrieval runs in this process: measure the code itself, not the instrumentation around it
+    profiler.configure(enabled=False)
+
+    results = {"meta": run_metadata(args)}
+    with tempfile.TemporaryDirectory(prefix="write-reflect-bench-") as workdir:
+        for suite in suites:
+            results[suite] = SUITE_RUNNERS[suite](args, workdir)
+
+    output = Path(args.output) if args.output else (
+        BENCH_DIR / "results" / f"{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n✅ Benchmark results saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+synthetic.py
+
+Generates reproducible synthetic data for the benchmark suite:
+- chunk CSVs in the format written by segment_text.py (id, text)
+- labeled CSVs in the format written by label_chunks_full.py (id, text, tags, reasoning)
+- embedded archives in the format written by embed_chunks.py (a pickled list of dicts with
+  id, text, tags, reasoning and a float32 embedding)
+
+Embeddings are drawn around a fixed number of random topic centres, so nearest-neighbour
+structure looks more like real writing than uniform noise does. Queries are noisy copies of
+randomly chosen archive embeddings.
+
+The same seed always produces the same data. numpy is only needed for the embedding functions.
+"""
+
+import csv
+import pickle
+import random
+
+
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+NUM_TOPICS = 64
+
+TAGS = [
+    "african_values_and_worldviews",
+    "language_and_translation",
+    "infrastructure_and_data_realities",
+    "personal_reflection",
+    "power_dynamics_global_north_south",
+    "speculative_or_poetic_expression",
+]
+
+WORDS = (
+    "community data language future memory power infrastructure story voice care land "
+    "knowledge question archive ethics youth climate network translation rhythm listening "
+    "repair value trust harvest market ancestor signal school city river"
+).split()
+
+
+def synthetic_text(rng, min_words=40, max_words=120):
+    """A pseudo-sentence of archive-like length (segment_text.py produces 1–3 sentence chunks)."""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def write_chunks_csv(path, num_rows, seed=0):
+    """Write an unlabeled chunk CSV (input of label_chunks_full.py)."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "text"])
+        for i in range(num_rows):
+            writer.writerow([i, synthetic_text(rng)])
+    return path
+
+
+def write_labeled_csv(path, num_rows, seed=0):
+    """Write a labeled chunk CSV (input of embed_chunks.py)."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "text", "tags", "reasoning"])
+        writer.writeheader()
+        for i in range(num_rows):
+            writer.writerow({
+                "id": i,
+                "text": synthetic_text(rng),
+                "tags": ", ".join(rng.sample(TAGS, 2)),
+                "reasoning": synthetic_text(rng, 10, 30),
+            })
+    return path
+
+
+def generate_embeddings(num_chunks, dim=EMBEDDING_DIM, seed=0, num_topics=NUM_TOPICS):
+    """Return a (num_chunks, dim) float32 matrix of unit vectors clustered around topic centres."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((num_topics, dim)).astype(np.float32)
+    topics = rng.integers(0, num_topics, size=num_chunks)
+    embeddings = centres[topics] + 0.8 * rng.standard_normal((num_chunks, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings
+
+
+def generate_queries(embeddings, num_queries, seed=0, noise=0.3):
+    """Return num_queries unit vectors, each a perturbed copy of a random archive embedding."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed + 1)
+    picks = rng.integers(0, len(embeddings), size=num_queries)
+    queries = embeddings[picks] + noise * rng.standard_normal((num_queries, embeddings.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries
+
+
+def write_archive_pickle(path, embeddings, seed=0):
+    """Write an archive pickle in the same shape as embed_chunks.py produces."""
+    rng = random.Random(seed)
+    records = []
+    for i, embedding in enumerate(embeddings):
+        records.append({
+            "id": i,
+            "text": f"Synthetic chunk {i} about {rng.choice(WORDS)} and {rng.choice(WORDS)}.",
+            "tags": ", ".join(rng.sample(TAGS, 2)),
+            "reasoning": f"Synthetic reasoning for chunk {i}.",
+            "embedding": embedding,
+        })
+    with open(path, "wb") as f:
+        pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def exact_top_k(embeddings, queries, k):
+    """Ground-truth top-k indices per query by exact cosine similarity (inputs are unit vectors)."""
+    import numpy as np
+
+    truth = []
+    for start in range(0, len(queries), 16):  # bound memory on 1M-chunk archives
+        scores = queries[start:start + 16] @ embeddings.T
+        top = np.argpartition(-scores, kth=k - 1, axis=1)[:, :k]
+        truth.extend(set(row.tolist()) for row in top)
+    return truth
@@ -13,27 +13,41 @@ Model used:
 This enables future semantic search: finding the most relevant text chunks for a given user query.
 """
 
+import argparse
 from sentence_transformers import SentenceTransformer
 import pandas as pd
 import pickle
 from pathlib import Path
 
+from profiling import span, print_profile_summary, add_profile_arguments, configure_from_args
+
+# Command-line options
+parser = add_profile_arguments(argparse.ArgumentParser(description="Embed labeled text chunks"))
+parser.add_argument("--input", default=None, help="Labeled CSV to embed (default: data/processed/writing_chunks_labeled.csv)")
+parser.add_argument("--output", default=None, help="Pickle to write (default: data/processed/embedded_chunks.pkl)")
+args = parser.parse_args()
+configure_from_args(args)
+
 # Set base directory and file paths
 base_path = Path(__file__).resolve().parent.parent
-input_path = base_path / "data" / "processed" / "writing_chunks_labeled.csv"
-output_path = base_path / "data" / "processed" / "embedded_chunks.pkl"
+input_path = Path(args.input) if args.input else base_path / "data" / "processed" / "writing_chunks_labeled.csv"
+output_path = Path(args.output) if args.output else base_path / "data" / "processed" / "embedded_chunks.pkl"
 
 # Load the labeled chunks
-df = pd.read_csv(input_path)
+with span("read_labels") as read_fields:
+    df = pd.read_csv(input_path)
+    read_fields["rows"] = len(df)
 
 # Load the sentence-transformers model
-model = SentenceTransformer("all-MiniLM-L6-v2")
+with span("load_model"):
+    model = SentenceTransformer("all-MiniLM-L6-v2")
 
 # Extract just the text chunks
 texts = df["text"].tolist()
 
 # Generate embeddings for each chunk
-embeddings = model.encode(texts, show_progress_bar=True)
+with span("encode", rows=len(texts)):
+    embeddings = model.encode(texts, show_progress_bar=True)
 
 # Combine embeddings with other data
 embedded_data = []
@@ -47,7 +61,10 @@ for i, row in df.iterrows():
     })
 
 # Save to pickle for later use
-with open(output_path, "wb") as f:
-    pickle.dump(embedded_data, f)
+with span("write_pickle", rows=len(embedded_data)):
+    with open(output_path, "wb") as f:
+        pickle.dump(embedded_data, f)
 
 print(f"\n✅ Embedded {len(embedded_data)} chunks and saved to: {output_path}")
+
+print_profile_summary()
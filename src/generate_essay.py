@@ -8,11 +8,20 @@ Each section is generated based on semantically retrieved chunks and a polished
 Includes automatic saving of the final essay + follow-up questions to user-specified .txt files.
 """
 
+import argparse
+import atexit
 import os
-from utils import load_archive, embed_query, get_top_chunks, format_chunks_as_context, query_llm, project_path
+from utils import load_archive, get_embedding_model, embed_query, get_top_chunks, format_chunks_as_context, query_llm, project_path
+from profiling import span, print_profile_summary, add_profile_arguments, configure_from_args
+
+# Command-line options (profiling only; everything else stays interactive)
+parser = add_profile_arguments(argparse.ArgumentParser(description="Terminal-based essay builder"))
+configure_from_args(parser.parse_args())
+atexit.register(print_profile_summary)  # also runs when the session ends with Ctrl+C
 
 # Load embedded archive (DataFrame with id, text, tags, reasoning, embedding)
 data = load_archive(project_path("data", "processed", "embedded_chunks.pkl"))
+get_embedding_model()  # load the model up front so the first query is not delayed
 
 
 
@@ -29,10 +38,11 @@ while True:
         break
 
     print("\nGenerating essay section...\n")
-    query_embedding = embed_query(query)
-    top_chunks = get_top_chunks(query_embedding, data)
-    prompt = format_chunks_as_context(top_chunks, query)
-    result = query_llm(prompt)
+    with span("answer_total"):
+        query_embedding = embed_query(query)
+        top_chunks = get_top_chunks(query_embedding, data)
+        prompt = format_chunks_as_context(top_chunks, query)
+        result = query_llm(prompt)
 
     # Extract essay section and follow-ups using marker
     if "--- FOLLOW-UP-BEGIN ---" in result:
@@ -7,13 +7,22 @@ This script allows you to type a reflective question and receive a short, though
 It uses the utils.py module for all core logic (embedding, similarity search, formatting, LLM call).
 """
 
-from utils import load_archive, embed_query, get_top_chunks, format_chunks_for_qa, query_llm, project_path
+import argparse
+import atexit
+from utils import load_archive, get_embedding_model, embed_query, get_top_chunks, format_chunks_for_qa, query_llm, project_path
+from profiling import span, print_profile_summary, add_profile_arguments, configure_from_args
 
 from pathlib import Path
 
+# Command-line options (profiling only; everything else stays interactive)
+parser = add_profile_arguments(argparse.ArgumentParser(description="Terminal-based reflective Q&A"))
+configure_from_args(parser.parse_args())
+atexit.register(print_profile_summary)  # also runs when the session ends with Ctrl+C
+
 # Load archive
 base_path = Path(__file__).resolve().parent.parent
 data = load_archive(project_path("data", "processed", "embedded_chunks.pkl"))
+get_embedding_model()  # load the model up front so the first query is not delayed
 
 print("\nWelcome to the Modular Q&A Companion 💬")
 print("Ask reflective questions to explore your archive.\n")
@@ -24,10 +33,11 @@ while True:
         break
 
     print("\nGenerating response...\n")
-    query_embedding = embed_query(query)
-    top_chunks = get_top_chunks(query_embedding, data)
-    prompt = format_chunks_for_qa(top_chunks, query)
-    result = query_llm(prompt)
+    with span("answer_total"):
+        query_embedding = embed_query(query)
+        top_chunks = get_top_chunks(query_embedding, data)
+        prompt = format_chunks_for_qa(top_chunks, query)
+        result = query_llm(prompt)
 
     # Split response into main part and follow-up questions
     if "--- FOLLOW-UP-BEGIN ---" in result:
@@ -5,12 +5,16 @@ Interactive Gradio interface for your Critical AI Writing Companion.
 Supports two modes:
 1. Q&A Mode — Ask a reflective question and get a one-off response.
 2. Essay Builder — Build an essay section-by-section and save it at the end.
+
+Run with --profile (or WRITE_REFLECT_PROFILE=1) to show a latency stats panel.
 """
 
+import argparse
 import gradio as gr
 import os
 from utils import (
     load_archive,
+    get_embedding_model,
     embed_query,
     get_top_chunks,
     format_chunks_as_context,
@@ -18,10 +22,17 @@ from utils import (
     query_llm,
     project_path
 )
+from profiling import profiler, span, add_profile_arguments, configure_from_args
+
+
+# Profiling options (unknown arguments are left for Gradio)
+parser = add_profile_arguments(argparse.ArgumentParser(description="Critical AI Writing Companion web interface"))
+configure_from_args(parser.parse_known_args()[0])
 
 
 # Load archive
 data = load_archive(project_path("data", "processed", "embedded_chunks.pkl"))
+get_embedding_model()  # load the model up front so the first query is not delayed
 
 
 # Essay content store
@@ -37,10 +48,11 @@ def toggle_mode(mode):
 
 # Essay section builder
 def add_essay_section(query, current_text, current_fups):
-    query_embedding = embed_query(query)
-    top_chunks = get_top_chunks(query_embedding, data)
-    prompt = format_chunks_as_context(top_chunks, query)
-    result = query_llm(prompt)
+    with span("answer_total", mode="essay"):
+        query_embedding = embed_query(query)
+        top_chunks = get_top_chunks(query_embedding, data)
+        prompt = format_chunks_as_context(top_chunks, query)
+        result = query_llm(prompt)
 
     # Extract essay body and follow-up section
     if "--- FOLLOW-UP-BEGIN ---" in result:
@@ -122,10 +134,15 @@ def save_essay(path, filename, filetype):
 
 # Q&A logic
 def run_qa(query):
-    query_embedding = embed_query(query)
-    top_chunks = get_top_chunks(query_embedding, data)
-    prompt = format_chunks_for_qa(top_chunks, query)
-    return query_llm(prompt)
+    with span("answer_total", mode="qa"):
+        query_embedding = embed_query(query)
+        top_chunks = get_top_chunks(query_embedding, data)
+        prompt = format_chunks_for_qa(top_chunks, query)
+        return query_llm(prompt)
+
+# Latency stats panel
+def show_stats():
+    return profiler.format_summary()
 
 # Gradio UI
 with gr.Blocks() as demo:
@@ -172,6 +189,12 @@ with gr.Blocks() as demo:
 
     mode.change(fn=toggle_mode, inputs=mode, outputs=[essay_builder, qa_mode])
 
+    # Latency Stats Section (only when profiling is enabled)
+    with gr.Accordion("⏱️ Latency Stats (ms, rolling window)", open=False, visible=profiler.enabled):
+        stats_display = gr.Textbox(label="Per-stage percentiles", lines=12, interactive=False)
+        stats_btn = gr.Button("Refresh Stats")
+        stats_btn.click(fn=show_stats, outputs=stats_display)
+
 # Launch
 if __name__ == "__main__":
     demo.launch()
@@ -17,11 +17,22 @@ Output (writes):
 Model: llama3:8b (Ollama)
 """
 
+import argparse
 import csv
+import os
 import requests
 import time
 import re
 
+from profiling import profiler, span, record_ollama_timings, print_profile_summary, add_profile_arguments, configure_from_args
+
+# Command-line options
+parser = add_profile_arguments(argparse.ArgumentParser(description="Label text chunks with thematic tags via Ollama"))
+parser.add_argument("--input", default=None, help="Chunk CSV to label (default: data/processed/writing_chunks.csv)")
+parser.add_argument("--output", default=None, help="Labeled CSV to write (default: data/processed/writing_chunks_labeled.csv)")
+args = parser.parse_args()
+configure_from_args(args)
+
 
 # Custom thematic tags list
 tags = [
@@ -54,15 +65,20 @@ from pathlib import Path
 
 # Define base directory dynamically (points one level up from /src)
 base_path = Path(__file__).resolve().parent.parent
-input_csv = base_path / "data" / "processed" / "writing_chunks.csv"
-output_csv = base_path / "data" / "processed" / "writing_chunks_labeled.csv"
+input_csv = Path(args.input) if args.input else base_path / "data" / "processed" / "writing_chunks.csv"
+output_csv = Path(args.output) if args.output else base_path / "data" / "processed" / "writing_chunks_labeled.csv"
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+# OLLAMA_URL can be overridden from the environment (e.g. to point at the benchmark mock server)
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/generate")
 MODEL_NAME = "llama3:8b"
 
-with open(input_csv, "r", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    chunks = list(reader)
+with span("read_chunks") as read_fields:
+    with open(input_csv, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        chunks = list(reader)
+    read_fields["rows"] = len(chunks)
+
+label_start = time.perf_counter()
 
 results = []
 
@@ -77,17 +93,23 @@ for i, row in enumerate(chunks):
     prompt = prompt_template + text
 
     try:
-        response = requests.post(
-            OLLAMA_URL,
-            json={
-                "model": MODEL_NAME,
-                "prompt": prompt,
-                "stream": False
-            }
-        )
+        with span("label_chunk", chunk_id=chunk_id) as chunk_fields:
+            response = requests.post(
+                OLLAMA_URL,
+                json={
+                    "model": MODEL_NAME,
+                    "prompt": prompt,
+                    "stream": False
+                }
+            )
+            chunk_fields["status"] = response.status_code
+
+            if response.status_code == 200:
+                payload = response.json()
+                chunk_fields.update(record_ollama_timings(payload))
 
         if response.status_code == 200:
-            result_text = response.json().get("response", "").strip()
+            result_text = payload.get("response", "").strip()
 
             # Split into tags and reasoning
             lines = result_text.split("\n")
@@ -122,10 +144,17 @@ for i, row in enumerate(chunks):
         "reasoning": reasoning
     })
 
+label_seconds = time.perf_counter() - label_start
+profiler.record("label_all", label_seconds * 1000.0, rows=len(results))
+
 # Write to CSV
-with open(output_csv, "w", encoding="utf-8", newline="") as f:
-    writer = csv.DictWriter(f, fieldnames=["id", "text", "tags", "reasoning"])
-    writer.writeheader()
-    writer.writerows(results)
+with span("write_labels", rows=len(results)):
+    with open(output_csv, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "text", "tags", "reasoning"])
+        writer.writeheader()
+        writer.writerows(results)
 
 print(f"\n Classification complete. Output saved to: {output_csv}")
+
+rate = len(results) / label_seconds if label_seconds else 0.0
+print_profile_summary(f"Latency profile (ms) — {len(results)} chunks in {label_seconds:.1f}s ({rate:.2f} chunks/s)")
@@ -0,0 +1,219 @@
+"""
+profiling.py
+
+Lightweight latency instrumentation for the Critical AI Writing Companion.
+Wraps each pipeline stage (embedding, retrieval, prompt building, LLM call) in a timing span,
+keeps a rolling window of durations per stage, and can append every span to a JSONL trace file.
+
+Profiling is off by default. Turn it on with:
+- the --profile / --trace flags of the CLI scripts, or
+- the environment variables WRITE_REFLECT_PROFILE=1 and WRITE_REFLECT_TRACE=path/to/trace.jsonl
+
+Each trace line is a JSON object such as:
+  {"ts": 1718000000.123, "span": "get_top_chunks", "ms": 12.4, "num_chunks": 5}
+
+Ollama reports its own timings (in nanoseconds) alongside each response. record_ollama_timings()
+turns them into separate "prefill" (prompt evaluation) and "generate" (token generation) spans,
+so slow answers can be attributed to a long prompt or a long response.
+"""
+
+import atexit
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+
+# Number of most recent samples kept per span for percentile calculations
+DEFAULT_WINDOW = 500
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Profiler:
+    """Collects timing spans in memory and optionally streams them to a JSONL trace file."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.enabled = False
+        self.trace_path = None
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+        self._trace_file = None
+        self._write_lock = threading.Lock()
+        self._close_at_exit = False
+
+    def configure(self, enabled=True, trace_path=None):
+        """Enable or disable profiling. Passing a trace path implies enabled=True."""
+        self.close()
+        self.enabled = bool(enabled or trace_path)
+        self.trace_path = str(trace_path) if trace_path else None
+        if self.trace_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.trace_path)), exist_ok=True)
+            # Line-buffered, so every span reaches the file without reopening it
+            self._trace_file = open(self.trace_path, "a", encoding="utf-8", buffering=1)
+            if not self._close_at_exit:
+                atexit.register(self.close)
+                self._close_at_exit = True
+
+    def close(self):
+        """Close the trace file, if one is open."""
+        with self._write_lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+                self._trace_file = None
+
+    def reset(self):
+        """Drop all collected samples (the trace file is left untouched)."""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    @contextmanager
+    def span(self, name, **fields):
+        """
+        Time the enclosed block and record it under `name`.
+        Yields a dict that the block may fill with extra fields (e.g. token counts) for the trace.
+        """
+        if not self.enabled:
+            yield fields
+            return
+
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0, **fields)
+
+    def record(self, name, duration_ms, **fields):
+        """Record a duration (in milliseconds) measured elsewhere."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._samples[name].append(duration_ms)
+            self._counts[name] += 1
+
+        if self._trace_file is not None:
+            entry = {"ts": round(time.time(), 3), "span": name, "ms": round(duration_ms, 3)}
+            entry.update(fields)
+            line = json.dumps(entry, default=str) + "\n"
+            with self._write_lock:
+                if self._trace_file is not None:
+                    self._trace_file.write(line)
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        """Return {span: {"count", "mean_ms", "p50_ms", ...}} over the rolling window."""
+        with self._lock:
+            snapshot = {name: sorted(values) for name, values in self._samples.items()}
+            counts = dict(self._counts)
+
+        stats = {}
+        for name, values in snapshot.items():
+            if not values:
+                continue
+            entry = {"count": counts.get(name, len(values)), "mean_ms": sum(values) / len(values)}
+            for pct in percentiles:
+                entry[f"p{pct}_ms"] = _percentile(values, pct)
+            stats[name] = entry
+        return stats
+
+    def format_summary(self, percentiles=DEFAULT_PERCENTILES):
+        """Render summary() as a fixed-width text table for terminals and the Gradio panel."""
+        stats = self.summary(percentiles)
+        if not stats:
+            return "No profiling data recorded yet."
+
+        columns = ["count", "mean_ms"] + [f"p{pct}_ms" for pct in percentiles]
+        width = max(len(name) for name in stats) + 2
+        lines = ["span".ljust(width) + "".join(col.rjust(10) for col in columns)]
+        for name, entry in stats.items():
+            row = name.ljust(width) + str(entry["count"]).rjust(10)
+            row += "".join(f"{entry[col]:10.1f}" for col in columns[1:])
+            lines.append(row)
+        return "\n".join(lines)
+
+
+# Shared profiler used by utils.py and the scripts
+profiler = Profiler()
+profiler.configure(
+    enabled=os.environ.get("WRITE_REFLECT_PROFILE", "").lower() in ("1", "true", "yes"),
+    trace_path=os.environ.get("WRITE_REFLECT_TRACE") or None,
+)
+
+
+def span(name, **fields):
+    """Shortcut for profiler.span()."""
+    return profiler.span(name, **fields)
+
+
+def timed(name):
+    """Decorator form of span() for functions whose body cannot easily be indented."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiler.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_ollama_timings(payload, prefix="llm"):
+    """
+    Extract Ollama's timing fields and token counts from a /api/generate response.
+    Records `<prefix>.prefill` and `<prefix>.generate` spans and returns the extracted fields
+    so they can also be attached to the surrounding span.
+    """
+    ns_to_ms = 1e-6
+    fields = {
+        "prompt_tokens": payload.get("prompt_eval_count"),
+        "response_tokens": payload.get("eval_count"),
+        "load_ms": (payload.get("load_duration") or 0) * ns_to_ms,
+        "prefill_ms": (payload.get("prompt_eval_duration") or 0) * ns_to_ms,
+        "generate_ms": (payload.get("eval_duration") or 0) * ns_to_ms,
+        "ollama_total_ms": (payload.get("total_duration") or 0) * ns_to_ms,
+    }
+
+    if payload.get("prompt_eval_duration") is not None:
+        profiler.record(f"{prefix}.prefill", fields["prefill_ms"], tokens=fields["prompt_tokens"])
+    if payload.get("eval_duration") is not None:
+        tokens_per_s = None
+        if fields["response_tokens"] and fields["generate_ms"]:
+            tokens_per_s = round(fields["response_tokens"] / (fields["generate_ms"] / 1000.0), 2)
+        profiler.record(f"{prefix}.generate", fields["generate_ms"],
+                        tokens=fields["response_tokens"], tokens_per_s=tokens_per_s)
+    return fields
+
+
+def print_profile_summary(title="Latency profile (ms)"):
+    """Print the shared profiler's summary table, if profiling is enabled."""
+    if profiler.enabled:
+        print(f"\n--- {title} ---\n")
+        print(profiler.format_summary())
+
+
+def add_profile_arguments(parser):
+    """Add the shared --profile and --trace options to an argparse parser."""
+    parser.add_argument("--profile", action="store_true",
+                        help="Time each pipeline stage and print latency percentiles on exit")
+    parser.add_argument("--trace", metavar="PATH", default=None,
+                        help="Append every timing span to this JSONL file (implies --profile)")
+    return parser
+
+
+def configure_from_args(args):
+    """Apply --profile / --trace, keeping any settings made through environment variables."""
+    if args.profile or args.trace:
+        profiler.configure(enabled=True, trace_path=args.trace or profiler.trace_path)
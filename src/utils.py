@@ -10,9 +10,12 @@ import torch
 from sentence_transformers import SentenceTransformer, util
 import pandas as pd
 import requests
+import os
 
 from pathlib import Path
 
+from profiling import span, timed, record_ollama_timings
+
 # Define the root directory (automatically detects project base)
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
@@ -21,35 +24,49 @@ def project_path(*subdirs):
     return PROJECT_ROOT.joinpath(*subdirs)
 
 
-# Load the embedding model once
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+# The embedding model is loaded once, on first use, so that archive loading and retrieval
+# can be used (and benchmarked) without downloading it
+embedding_model = None
+
+def get_embedding_model():
+    """Return the shared sentence-transformers model, loading it on the first call."""
+    global embedding_model
+    if embedding_model is None:
+        with span("load_embedding_model"):
+            embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+    return embedding_model
 
-# Ollama config
-OLLAMA_URL = "http://localhost:11434/api/generate"
+# Ollama config (OLLAMA_URL can be overridden from the environment, e.g. for the benchmark mock server)
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/generate")
 DEFAULT_MODEL = "llama3:8b"
 
 def load_archive(pickle_path):
     """Load archived data with embeddings, tags, and reasoning."""
     # IMPORTANT: pickle_path must be passed relative to the script location (e.g. "../data/processed/embedded_chunks.pkl")
-    raw = pd.read_pickle(pickle_path)
-    df = pd.DataFrame(raw)
+    with span("load_archive") as fields:
+        raw = pd.read_pickle(pickle_path)
+        df = pd.DataFrame(raw)
+        fields["rows"] = len(df)
     return df
 
 def embed_query(query):
     """Convert a query string to a sentence embedding tensor."""
-    return embedding_model.encode(query, convert_to_tensor=True).cpu()
+    with span("embed_query"):
+        return get_embedding_model().encode(query, convert_to_tensor=True).cpu()
 
 def get_top_chunks(query_embedding, df, num_chunks=5):
     """Retrieve top-N semantically similar archive chunks based on cosine similarity."""
-    archive_embeddings = torch.stack([
-        torch.tensor(e, dtype=torch.float32) for e in df["embedding"]
-    ]).cpu()
+    with span("get_top_chunks", num_chunks=num_chunks, archive_size=len(df)):
+        archive_embeddings = torch.stack([
+            torch.tensor(e, dtype=torch.float32) for e in df["embedding"]
+        ]).cpu()
 
-    similarities = util.cos_sim(query_embedding, archive_embeddings)[0]
-    top_indices = similarities.topk(num_chunks).indices.tolist()
-    return df.iloc[top_indices].to_dict("records")
+        similarities = util.cos_sim(query_embedding, archive_embeddings)[0]
+        top_indices = similarities.topk(num_chunks).indices.tolist()
+        return df.iloc[top_indices].to_dict("records")
 
 
+@timed("build_prompt")
 def format_chunks_as_context(chunks, query):
     """
     Construct a complete prompt to send to the LLM.
@@ -82,6 +99,7 @@ Your response:
 """
     return prompt.strip()
 
+@timed("build_prompt")
 def format_chunks_for_qa(chunks, query):
     """
     Prompt for conversational Q&A. Responds reflectively to a user’s question.
@@ -116,12 +134,19 @@ Your response:
 
 
 def query_llm(prompt, model=DEFAULT_MODEL):
-    """Send a prompt to the LLM running via Ollama and return the response."""
-    response = requests.post(
-        OLLAMA_URL,
-        json={"model": model, "prompt": prompt, "stream": False}
-    )
-    if response.status_code == 200:
-        return response.json().get("response", "[No response returned]").strip()
-    else:
-        return f"[Error: HTTP {response.status_code} – check if Ollama is running?]"
+    """
+    Send a prompt to the LLM running via Ollama and return the response.
+    When profiling is enabled, Ollama's prefill/generation timings and token counts are recorded too.
+    """
+    with span("query_llm", model=model) as fields:
+        response = requests.post(
+            OLLAMA_URL,
+            json={"model": model, "prompt": prompt, "stream": False}
+        )
+        fields["status"] = response.status_code
+        if response.status_code == 200:
+            payload = response.json()
+            fields.update(record_ollama_timings(payload))
+            return payload.get("response", "[No response returned]").strip()
+        else:
+            return f"[Error: HTTP {response.status_code} – check if Ollama is running?]"
@@ -0,0 +1,85 @@
+import json
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import synthetic
+from mock_ollama import MOCK_RESPONSE, MockOllamaServer
+from run_benchmarks import parse_size
+
+
+def generate(url, prompt="one two three four"):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps({"model": "llama3:8b", "prompt": prompt, "stream": False}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def test_mock_response_shape():
+    with MockOllamaServer(port=0, latency_ms=20, prefill_ms_per_token=1.0,
+                          generate_ms_per_token=0.5) as server:
+        payload = generate(server.url)
+
+    response_tokens = len(MOCK_RESPONSE.split())
+    assert payload["model"] == "llama3:8b"
+    assert payload["response"] == MOCK_RESPONSE
+    assert payload["done"] is True
+    assert payload["prompt_eval_count"] == 4
+    assert payload["eval_count"] == response_tokens
+    assert payload["prompt_eval_duration"] == 4_000_000  # 4 tokens * 1 ms, in ns
+    assert payload["eval_duration"] == int(response_tokens * 0.5 * 1e6)
+    expected_ms = 20 + 4 * 1.0 + response_tokens * 0.5
+    assert payload["total_duration"] >= expected_ms * 1e6 * 0.9
+    assert server.requests_served == 1
+
+
+def test_mock_concurrency_one_serialises_requests():
+    with MockOllamaServer(port=0, latency_ms=150, concurrency=1) as server:
+        threads = [threading.Thread(target=generate, args=(server.url,)) for _ in range(2)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    assert server.requests_served == 2
+    assert elapsed >= 0.3
+
+
+def test_mock_rejects_non_positive_concurrency():
+    with pytest.raises(ValueError):
+        MockOllamaServer(port=0, concurrency=0)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1k", 1_000),
+    ("100k", 100_000),
+    ("1m", 1_000_000),
+    ("1M", 1_000_000),
+    ("2500", 2_500),
+])
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+def test_exact_top_k_matches_argsort():
+    np = pytest.importorskip("numpy")
+
+    embeddings = synthetic.generate_embeddings(200, dim=16, seed=3)
+    queries = synthetic.generate_queries(embeddings, 40, seed=3)
+    truth = synthetic.exact_top_k(embeddings, queries, 5)
+
+    expected = np.argsort(-(queries @ embeddings.T), axis=1)[:, :5]
+    assert truth == [set(row.tolist()) for row in expected]
@@ -0,0 +1,148 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import profiling
+from profiling import Profiler, _percentile, record_ollama_timings
+
+
+@pytest.mark.parametrize("values, expected", [
+    ([7], {50: 7, 90: 7, 99: 7}),
+    ([1, 2], {50: 1, 90: 2, 99: 2}),
+    ([1, 2, 3, 4, 5], {50: 3, 90: 5, 99: 5}),
+    (list(range(1, 11)), {50: 5, 90: 9, 99: 10}),
+])
+def test_percentile_nearest_rank(values, expected):
+    for pct, value in expected.items():
+        assert _percentile(values, pct) == value
+
+
+def test_percentile_empty():
+    assert _percentile([], 50) is None
+
+
+def test_summary_over_rolling_window():
+    stats = Profiler(window=5)
+    stats.configure(enabled=True)
+    for duration in range(1, 11):
+        stats.record("stage", float(duration))
+
+    summary = stats.summary()["stage"]
+    assert summary["count"] == 10  # total recorded, not just the window
+    assert summary["mean_ms"] == 8.0  # window holds 6..10
+    assert (summary["p50_ms"], summary["p90_ms"], summary["p99_ms"]) == (8.0, 10.0, 10.0)
+
+
+def test_disabled_profiler_records_nothing():
+    stats = Profiler()
+    with stats.span("stage"):
+        pass
+    stats.record("stage", 1.0)
+    assert stats.summary() == {}
+
+
+@pytest.fixture
+def traced_profiler(tmp_path):
+    trace_path = tmp_path / "trace.jsonl"
+    profiling.profiler.configure(enabled=True, trace_path=trace_path)
+    profiling.profiler.reset()
+    yield trace_path
+    profiling.profiler.configure(enabled=False)
+    profiling.profiler.reset()
+
+
+def read_trace(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_record_ollama_timings_converts_ns_to_ms(traced_profiler):
+    fields = record_ollama_timings({
+        "prompt_eval_count": 120,
+        "eval_count": 40,
+        "load_duration": 5_000_000,
+        "prompt_eval_duration": 250_000_000,
+        "eval_duration": 2_000_000_000,
+        "total_duration": 2_300_000_000,
+    })
+
+    assert fields["prompt_tokens"] == 120
+    assert fields["response_tokens"] == 40
+    assert fields["load_ms"] == pytest.approx(5.0)
+    assert fields["prefill_ms"] == pytest.approx(250.0)
+    assert fields["generate_ms"] == pytest.approx(2000.0)
+    assert fields["ollama_total_ms"] == pytest.approx(2300.0)
+
+    summary = profiling.profiler.summary()
+    assert summary["llm.prefill"]["p50_ms"] == pytest.approx(250.0)
+    assert summary["llm.generate"]["p50_ms"] == pytest.approx(2000.0)
+
+
+def test_record_ollama_timings_skips_missing_fields(traced_profiler):
+    record_ollama_timings({"eval_count": 10, "eval_duration": 1_000_000_000})
+    assert set(profiling.profiler.summary()) == {"llm.generate"}
+
+    profiling.profiler.reset()
+    record_ollama_timings({"prompt_eval_count": 10, "prompt_eval_duration": 1_000_000})
+    assert set(profiling.profiler.summary()) == {"llm.prefill"}
+
+    profiling.profiler.reset()
+    record_ollama_timings({"response": "no timings"})
+    assert profiling.profiler.summary() == {}
+
+
+def test_record_ollama_timings_trace_shape(traced_profiler):
+    record_ollama_timings({
+        "prompt_eval_count": 100,
+        "eval_count": 50,
+        "prompt_eval_duration": 200_000_000,
+        "eval_duration": 1_000_000_000,
+    }, prefix="label")
+
+    prefill, generate = read_trace(traced_profiler)
+    assert set(prefill) == {"ts", "span", "ms", "tokens"}
+    assert prefill["span"] == "label.prefill"
+    assert prefill["ms"] == 200.0
+    assert prefill["tokens"] == 100
+    assert isinstance(prefill["ts"], float)
+
+    assert set(generate) == {"ts", "span", "ms", "tokens", "tokens_per_s"}
+    assert generate["span"] == "label.generate"
+    assert generate["ms"] == 1000.0
+    assert generate["tokens"] == 50
+    assert generate["tokens_per_s"] == 50.0
+
+
+def test_trace_file_kept_open_and_closed_on_reconfigure(tmp_path):
+    stats = Profiler()
+    first, second = tmp_path / "first.jsonl", tmp_path / "second.jsonl"
+
+    stats.configure(trace_path=first)
+    handle = stats._trace_file
+    stats.record("a", 1.0)
+    stats.record("b", 2.0)
+    assert stats._trace_file is handle  # one handle for all spans
+    assert [entry["span"] for entry in read_trace(first)] == ["a", "b"]  # line-buffered
+
+    stats.configure(trace_path=second)
+    assert handle.closed
+    stats.record("c", 3.0)
+    stats.close()
+    assert [entry["span"] for entry in read_trace(second)] == ["c"]
+    assert len(read_trace(first)) == 2
+
+
+def test_print_profile_summary(traced_profiler, capsys):
+    profiling.profiler.record("stage", 4.0)
+    profiling.print_profile_summary("Custom title")
+    out = capsys.readouterr().out
+    assert "--- Custom title ---" in out
+    assert "stage" in out
+
+    profiling.profiler.configure(enabled=False)
+    profiling.print_profile_summary()
+    assert capsys.readouterr().out == ""